@@ -15,6 +15,7 @@ from flow.core.params import SumoParams, EnvParams, InitialConfig, NetParams, \
     SumoCarFollowingParams
 from flow.core.params import VehicleParams
 from flow.controllers import IDMController, ContinuousRouter, RLController
+from flow.controllers.idm_numba import compile_idm_accels
 from flow.networks.figure_eight import ADDITIONAL_NET_PARAMS
 from flow.utils.registry import env_constructor
 from flow.utils.rllib import FlowParamsEncoder, get_flow_params
@@ -99,6 +100,9 @@ def run_model(num_cpus=1, rollout_size=50, num_steps=50):
         constructor = env_constructor(params=flow_params, version=0)()
         env = DummyVecEnv([lambda: constructor])  # The algorithms require a vectorized environment to run
     else:
+        # compile the IDM accelerations once, so that the workers load them
+        # from numba's cache instead of each compiling them
+        compile_idm_accels()
         env = SubprocVecEnv([env_constructor(params=flow_params, version=i) for i in range(num_cpus)])
 
     model = PPO2('MlpPolicy', env, verbose=1, n_steps=rollout_size)
@@ -14,6 +14,7 @@ from stable_baselines import PPO2
 from flow.core.params import SumoParams, EnvParams, InitialConfig, NetParams
 from flow.core.params import VehicleParams, SumoCarFollowingParams
 from flow.controllers import RLController, IDMController, ContinuousRouter
+from flow.controllers.idm_numba import compile_idm_accels
 from flow.utils.registry import env_constructor
 from flow.utils.rllib import FlowParamsEncoder, get_flow_params
 
@@ -96,6 +97,9 @@ def run_model(num_cpus=1, rollout_size=50, num_steps=50):
         constructor = env_constructor(params=flow_params, version=0)()
         env = DummyVecEnv([lambda: constructor])  # The algorithms require a vectorized environment to run
     else:
+        # compile the IDM accelerations once, so that the workers load them
+        # from numba's cache instead of each compiling them
+        compile_idm_accels()
         env = SubprocVecEnv([env_constructor(params=flow_params, version=i) for i in range(num_cpus)])
 
     model = PPO2('MlpPolicy', env, verbose=1, n_steps=rollout_size)
@@ -1,10 +1,13 @@
 """Traffic Light Grid example."""
 
 import argparse
+import copy
+import functools
 import json
 import os
 
-from stable_baselines.common.vec_env import DummyVecEnv, SubprocVecEnv
+import numpy as np
+from stable_baselines.common.vec_env import DummyVecEnv
 from stable_baselines import PPO2
 
 from flow.core.params import SumoParams, EnvParams, InitialConfig, NetParams, \
@@ -13,6 +16,7 @@ from flow.core.params import VehicleParams
 from flow.controllers import SimCarFollowingController, GridRouter
 from flow.utils.registry import env_constructor
 from flow.utils.rllib import FlowParamsEncoder, get_flow_params
+from flow.utils.vec_env import ShmemVecEnv, GroupedSubprocVecEnv
 
 # time horizon of a single rollout
 HORIZON = 200
@@ -243,24 +247,116 @@ def setup_exps(use_inflows=False):
     return initial_config, net_params
 
 
-def run_model(num_cpus=1, rollout_size=50, num_steps=50, use_inflows=False):
+def make_env(flow_params_json, version):
+    """Create an environment from its serialized flow parameters.
+
+    This is used to build the environments of the vectorized environments, so
+    that the subprocesses receive the parameters as a single string rather than
+    a pickled closure over the flow_params dict.
+
+    Parameters
+    ----------
+    flow_params_json : str
+        flow-related parameters, serialized with FlowParamsEncoder
+    version : int
+        environment version number
+
+    Returns
+    -------
+    gym.Env
+        the created environment
+    """
+    params = get_flow_params({'env_config': {'flow_params': flow_params_json}})
+    return env_constructor(params=params, version=version)()
+
+
+def run_model(num_cpus=1, rollout_size=50, num_steps=50, use_inflows=False, envs_per_proc=1):
     """Run the model for num_steps if provided. The total rollout length is rollout_size."""
     initial_config, net_params = setup_exps(use_inflows)
     # add the new parameters to flow_params
     flow_params['initial'] = initial_config
     flow_params['net'] = net_params
 
-    if num_cpus == 1:
-        constructor = env_constructor(params=flow_params, version=0)()
+    # parameters of the training environments
+    train_params = flow_params.copy()
+    if num_cpus > 1 or envs_per_proc > 1:
+        # share the cores between the SUMO instances stepped at the same time,
+        # one per subprocess. This is set on a copy, so that the saved
+        # parameters used for replays are left unchanged
+        train_params['sim'] = copy.deepcopy(flow_params['sim'])
+        train_params['sim'].sumo_threads = max(1, os.cpu_count() // num_cpus)
+
+    # serialize the parameters once for all environment constructors
+    flow_params_json = json.dumps(train_params, cls=FlowParamsEncoder, sort_keys=True)
+
+    if num_cpus == 1 and envs_per_proc == 1:
+        constructor = env_constructor(params=train_params, version=0)()
         env = DummyVecEnv([lambda: constructor])  # The algorithms require a vectorized environment to run
+    elif envs_per_proc == 1:
+        # observations are passed back from the workers through shared memory
+        env = ShmemVecEnv([functools.partial(make_env, flow_params_json, i) for i in range(num_cpus)],
+                          start_method='forkserver')
     else:
-        env = SubprocVecEnv([env_constructor(params=flow_params, version=i) for i in range(num_cpus)])
+        # run several environments in each worker to reduce the time spent
+        # waiting on the slowest simulation every step
+        env = GroupedSubprocVecEnv(
+            [functools.partial(make_env, flow_params_json, i) for i in range(num_cpus * envs_per_proc)],
+            envs_per_proc=envs_per_proc,
+            start_method='forkserver')
 
     model = PPO2('MlpPolicy', env, verbose=1, n_steps=rollout_size)
     model.learn(total_timesteps=num_steps)
     return model
 
 
+def evaluate_model(model, params, num_envs):
+    """Evaluate a trained policy on several environments at once.
+
+    The environments are run in parallel and split into two groups. The
+    actions of one group are computed by the policy while the other group is
+    being simulated, so that the time spent in the policy is hidden behind
+    the simulations.
+
+    Parameters
+    ----------
+    model : stable_baselines.PPO2
+        the trained model
+    params : dict
+        flow-related parameters, see flow.utils.registry.make_create_env
+    num_envs : int
+        number of environments to evaluate the policy on, at least 2
+
+    Returns
+    -------
+    np.ndarray
+        cumulative reward of each environment over one rollout
+    """
+    params_json = json.dumps(params, cls=FlowParamsEncoder, sort_keys=True)
+    env_fns = [functools.partial(make_env, params_json, i) for i in range(num_envs)]
+    envs = [ShmemVecEnv(env_fns[:num_envs // 2], start_method='forkserver'),
+            ShmemVecEnv(env_fns[num_envs // 2:], start_method='forkserver')]
+    obs = [env.reset() for env in envs]
+    rewards = [np.zeros(env.num_envs) for env in envs]
+
+    horizon = params['env'].horizon
+    envs[0].step_async(model.predict(obs[0])[0])
+    for t in range(horizon):
+        # compute the actions of the second group while the first is simulated
+        envs[1].step_async(model.predict(obs[1])[0])
+        obs[0], reward, _, _ = envs[0].step_wait()
+        rewards[0] += reward
+
+        # compute the actions of the first group while the second is simulated
+        if t < horizon - 1:
+            envs[0].step_async(model.predict(obs[0])[0])
+        obs[1], reward, _, _ = envs[1].step_wait()
+        rewards[1] += reward
+
+    for env in envs:
+        env.close()
+    return np.concatenate(rewards)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--num_cpus', type=int, default=1, help='How many CPUs to use')
@@ -268,8 +364,10 @@ if __name__ == "__main__":
     parser.add_argument('--rollout_size', type=int, default=1000, help='How many steps are in a training batch.')
     parser.add_argument('--result_name', type=str, default='traffic_light_grid', help='Name of saved model')
     parser.add_argument('--use_inflows', action='store_true')
+    parser.add_argument('--envs_per_proc', type=int, default=1, help='How many environments to run in each CPU')
+    parser.add_argument('--num_eval', type=int, default=1, help='How many environments to evaluate the model on')
     args = parser.parse_args()
-    model = run_model(args.num_cpus, args.rollout_size, args.num_steps, args.use_inflows)
+    model = run_model(args.num_cpus, args.rollout_size, args.num_steps, args.use_inflows, args.envs_per_proc)
     # Save the model to a desired folder and then delete it to demonstrate loading
     if not os.path.exists(os.path.realpath(os.path.expanduser('~/baseline_results'))):
         os.makedirs(os.path.realpath(os.path.expanduser('~/baseline_results')))
@@ -287,9 +385,13 @@ if __name__ == "__main__":
     print('Loading the trained model and testing it out!')
     model = PPO2.load(save_path)
     flow_params = get_flow_params(os.path.join(path, args.result_name) + '.json')
+    if args.num_eval > 1:
+        rewards = evaluate_model(model, flow_params, args.num_eval)
+        print('the average final reward over {} rollouts is {}'.format(args.num_eval, np.mean(rewards)))
+    # Visualize a single rollout
     flow_params['sim'].render = True
-    env_constructor = env_constructor(params=flow_params, version=0)()
-    env = DummyVecEnv([lambda: env_constructor])  # The algorithms require a vectorized environment to run
+    constructor = env_constructor(params=flow_params, version=0)()
+    env = DummyVecEnv([lambda: constructor])  # The algorithms require a vectorized environment to run
     obs = env.reset()
     reward = 0
     for i in range(flow_params['env'].horizon):
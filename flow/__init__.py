@@ -1,6 +1,14 @@
 """Returns features of the Flow repository (e.g. version number)."""
 
+import os
+
 from .version import __version__ as v
 
 # flow repo version number
 __version__ = v
+
+# store the functions compiled by numba (if installed) in a cache shared by
+# every process, so that parallel workers load them instead of compiling them
+# again. This must be set before numba is imported.
+os.environ.setdefault(
+    "NUMBA_CACHE_DIR", os.path.expanduser("~/.flow_numba_cache"))
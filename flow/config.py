@@ -4,7 +4,15 @@ import os
 
 PYTHON_COMMAND = "python"
 
-SUMO_SLEEP = 1.0  # Delay between initializing SUMO and connecting with TraCI
+# Maximum time spent polling for a starting SUMO instance before connecting
+# with TraCI's own (slower) retries
+SUMO_SLEEP = 1.0
+
+# whether to run SUMO within the Python process through libsumo (if it is
+# installed) instead of connecting to a SUMO subprocess through TraCI. This is
+# only done when sumo-gui is not needed, and supports a single simulation per
+# process.
+USE_LIBSUMO = os.environ.get("FLOW_USE_LIBSUMO", "0") == "1"
 
 PROJECT_PATH = osp.abspath(osp.join(osp.dirname(__file__), '..'))
 
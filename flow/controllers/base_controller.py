@@ -1,5 +1,7 @@
 """Contains the base acceleration controller class."""
 
+import collections
+
 import numpy as np
 
 
@@ -67,7 +69,30 @@ class BaseController:
         """Return the acceleration of the controller."""
         raise NotImplementedError
 
-    def get_action(self, env):
+    @classmethod
+    def get_accels(cls, controllers, env):
+        """Return the accelerations of several controllers of this class.
+
+        This may be overridden to compute the accelerations of all vehicles
+        sharing a controller class at once (see get_actions). By default,
+        None is returned, and get_accel is called separately by get_action
+        for each vehicle.
+
+        Parameters
+        ----------
+        controllers : list of BaseController
+            controllers of the vehicles, all of this class
+        env : flow.envs.Env
+            state of the environment at the current time step
+
+        Returns
+        -------
+        array_like or None
+            the accelerations of the controllers, or None if not supported
+        """
+        return None
+
+    def get_action(self, env, accel=None):
         """Convert the get_accel() acceleration into an action.
 
         If None is returned, in case of no acceleration is specified or other conditions,
@@ -81,6 +106,9 @@ class BaseController:
         ----------
         env : flow.envs.Env
             state of the environment at the current time step
+        accel : float, optional
+            the acceleration returned by get_accel, if it was already computed
+            (e.g. by get_accels). It is otherwise computed here.
 
         Returns
         -------
@@ -97,7 +125,8 @@ class BaseController:
         if env.k.vehicle.get_edge(self.veh_id)[0] == ":":
             return None
 
-        accel = self.get_accel(env)
+        if accel is None:
+            accel = self.get_accel(env)
 
         # If no acceleration is specified, let SUMO take over for the current
         # time step
@@ -242,3 +271,45 @@ class BaseController:
         v_safe = 2 * h / env.sim_step + dv - this_vel * (2 * self.delay)
 
         return v_safe
+
+
+def get_actions(controllers, env):
+    """Return the actions of several acceleration controllers.
+
+    The accelerations of controllers that share a class are computed together
+    through the get_accels method of that class (if supported), and are then
+    converted into actions by the get_action method of each controller.
+
+    Parameters
+    ----------
+    controllers : list of BaseController
+        the acceleration controllers of the vehicles
+    env : flow.envs.Env
+        state of the environment at the current time step
+
+    Returns
+    -------
+    list of float
+        the actions of the controllers, see BaseController.get_action
+    """
+    # group the controllers by class
+    groups = collections.OrderedDict()
+    for controller in controllers:
+        groups.setdefault(type(controller), []).append(controller)
+
+    # accelerations computed for whole groups, keyed by controller id. Classes
+    # that override get_action may not accept a precomputed acceleration
+    accels = {}
+    for controller_class, group in groups.items():
+        if controller_class.get_action is not BaseController.get_action:
+            continue
+        group_accels = controller_class.get_accels(group, env)
+        if group_accels is not None:
+            accels.update(zip(map(id, group), group_accels))
+
+    actions = []
+    for controller in controllers:
+        accel = accels.get(id(controller))
+        actions.append(controller.get_action(env) if accel is None
+                       else controller.get_action(env, accel))
+    return actions
@@ -12,6 +12,7 @@ import math
 import numpy as np
 
 from flow.controllers.base_controller import BaseController
+from flow.controllers.idm_numba import idm_accels
 
 
 class CFMController(BaseController):
@@ -485,6 +486,36 @@ class IDMController(BaseController):
 
         return self.a * (1 - (v / self.v0)**self.delta - (s_star / h)**2)
 
+    @classmethod
+    def get_accels(cls, controllers, env):
+        """See parent class.
+
+        The accelerations are computed in a single call to
+        flow.controllers.idm_numba.idm_accels.
+        """
+        # subclasses with a different model cannot use the IDM equations
+        if cls.get_accel is not IDMController.get_accel:
+            return None
+
+        veh_ids = [controller.veh_id for controller in controllers]
+        lead_ids = env.k.vehicle.get_leader(veh_ids)
+        has_leader = np.array(
+            [lead_id is not None and lead_id != '' for lead_id in lead_ids])
+
+        # vehicles without a leader use their own speed as a placeholder
+        lead_ids = [lead_id if has_lead else veh_id for veh_id, lead_id,
+                    has_lead in zip(veh_ids, lead_ids, has_leader)]
+
+        v = np.array(env.k.vehicle.get_speed(veh_ids), dtype=float)
+        v_lead = np.array(env.k.vehicle.get_speed(lead_ids), dtype=float)
+        h = np.array(env.k.vehicle.get_headway(veh_ids), dtype=float)
+        v0, T, a, b, delta, s0 = np.array(
+            [[controller.v0, controller.T, controller.a, controller.b,
+              controller.delta, controller.s0] for controller in controllers],
+            dtype=float).T
+
+        return idm_accels(v, v_lead, h, has_leader, v0, T, a, b, delta, s0)
+
 
 class SimCarFollowingController(BaseController):
     """Controller whose actions are purely defined by the simulator.
@@ -0,0 +1,75 @@
+"""Vectorized Intelligent Driver Model (IDM) accelerations.
+
+The accelerations are compiled with numba if it is installed, and are
+otherwise computed with numpy.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Return the decorated function as is, since numba is missing."""
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def idm_accels(v, v_lead, h, has_leader, v0, T, a, b, delta, s0):
+    """Return the IDM accelerations of several vehicles.
+
+    This matches flow.controllers.IDMController.get_accel, with one element
+    per vehicle in each of the arrays below.
+
+    Parameters
+    ----------
+    v : np.ndarray
+        speeds of the vehicles, in m/s
+    v_lead : np.ndarray
+        speeds of the leaders of the vehicles, in m/s. Ignored for vehicles
+        without a leader.
+    h : np.ndarray
+        headways of the vehicles, in m
+    has_leader : np.ndarray
+        whether each vehicle has a leader
+    v0 : np.ndarray
+        desirable velocities, in m/s
+    T : np.ndarray
+        safe time headways, in s
+    a : np.ndarray
+        max accelerations, in m/s2
+    b : np.ndarray
+        comfortable decelerations, in m/s2
+    delta : np.ndarray
+        acceleration exponents
+    s0 : np.ndarray
+        linear jam distances, in m
+
+    Returns
+    -------
+    np.ndarray
+        the accelerations of the vehicles, in m/s2
+    """
+    # in order to deal with ZeroDivisionError
+    h = h.copy()
+    h[np.abs(h) < 1e-3] = 1e-3
+
+    # the desired gap is only used by vehicles with a car ahead
+    s_star = (s0 + np.maximum(
+        0., v * T + v * (v - v_lead) / (2 * np.sqrt(a * b)))) * has_leader
+
+    return a * (1 - (v / v0)**delta - (s_star / h)**2)
+
+
+def compile_idm_accels():
+    """Compile idm_accels for the argument types used by IDMController.
+
+    When numba is installed, this fills the on-disk cache of the compiled
+    function, so that it can be called in subprocesses without compiling it
+    again. Otherwise, this does nothing of use.
+    """
+    ones = np.ones(1)
+    idm_accels(ones, ones, ones, np.ones(1, dtype=bool), ones, ones, ones,
+               ones, ones, ones)
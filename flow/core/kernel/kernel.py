@@ -65,6 +65,9 @@ class Kernel(object):
         """
         self.kernel_api = None
 
+        # update methods of the kernel subclasses, see pass_api
+        self._update_fns = ()
+
         if simulator == "traci":
             self.simulation = TraCISimulation(self)
             self.network = TraCIKernelNetwork(self, sim_params)
@@ -87,6 +90,17 @@ class Kernel(object):
         self.vehicle.pass_api(kernel_api)
         self.traffic_light.pass_api(kernel_api)
 
+        # store the bound update methods of the kernel subclasses, as update
+        # is called every simulation step. This is done here rather than upon
+        # initialization since the environments replace the vehicle kernel
+        # before restarting a simulation.
+        self._update_fns = (
+            self.vehicle.update,
+            self.traffic_light.update,
+            self.network.update,
+            self.simulation.update,
+        )
+
     def update(self, reset):
         """Update the kernel subclasses after a simulation step.
 
@@ -101,10 +115,8 @@ class Kernel(object):
             specifies whether the simulator was reset in the last simulation
             step
         """
-        self.vehicle.update(reset)
-        self.traffic_light.update(reset)
-        self.network.update(reset)
-        self.simulation.update(reset)
+        for update_fn in self._update_fns:
+            update_fn(reset)
 
     def close(self):
         """Terminate all components within the simulation and network."""
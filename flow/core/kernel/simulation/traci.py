@@ -5,6 +5,7 @@ from flow.core.util import ensure_dir
 import flow.config as config
 import traci.constants as tc
 import traci
+from traci.exceptions import FatalTraCIError, TraCIException
 import traceback
 import os
 import time
@@ -12,10 +13,24 @@ import logging
 import subprocess
 import signal
 
+try:
+    import libsumo
+except ImportError:
+    libsumo = None
+
+# Errors raised by the kernel API. libsumo raises its own exception types,
+# which do not derive from the ones raised by traci
+TRACI_ERRORS = (FatalTraCIError, TraCIException)
+if libsumo is not None:
+    TRACI_ERRORS += (libsumo.FatalTraCIError, libsumo.TraCIException)
+
 
 # Number of retries on restarting SUMO before giving up
 RETRIES_ON_ERROR = 10
 
+# Time between attempts to connect to a starting SUMO instance (in seconds)
+CONNECT_INTERVAL = 0.005
+
 
 class TraCISimulation(KernelSimulation):
     """Sumo simulation kernel.
@@ -35,6 +50,19 @@ class TraCISimulation(KernelSimulation):
         KernelSimulation.__init__(self, master_kernel)
         # contains the subprocess.Popen instance used to start traci
         self.sumo_proc = None
+        # specifies whether SUMO is run in-process through libsumo
+        self.use_libsumo = False
+
+        # subscription results collected after the most recent simulation
+        # step, shared with the other sub-kernels during their update
+        self.sim_subscriptions = {}
+        self.vehicle_subscriptions = {}
+        self.tls_subscriptions = {}
+
+        # most recent command used to start SUMO, and the inputs it was
+        # created from
+        self._sumo_call_key = None
+        self._sumo_call_template = ()
 
     def pass_api(self, kernel_api):
         """See parent class.
@@ -52,8 +80,19 @@ class TraCISimulation(KernelSimulation):
         ])
 
     def simulation_step(self):
-        """See parent class."""
+        """See parent class.
+
+        The subscription results of the simulation, the vehicles, and the
+        traffic lights are collected once after the step, and are read by the
+        other sub-kernels when they are updated.
+        """
         self.kernel_api.simulationStep()
+        self.sim_subscriptions = \
+            self.kernel_api.simulation.getSubscriptionResults()
+        self.vehicle_subscriptions = \
+            self.kernel_api.vehicle.getAllSubscriptionResults()
+        self.tls_subscriptions = \
+            self.kernel_api.trafficlight.getAllSubscriptionResults()
 
     def update(self, reset):
         """See parent class."""
@@ -62,10 +101,18 @@ class TraCISimulation(KernelSimulation):
     def close(self):
         """See parent class."""
         self.kernel_api.close()
+        self.sim_subscriptions = {}
+        self.vehicle_subscriptions = {}
+        self.tls_subscriptions = {}
 
     def check_collision(self):
-        """See parent class."""
-        return self.kernel_api.simulation.getStartingTeleportNumber() != 0
+        """See parent class.
+
+        This uses the vehicles starting to teleport in the last step, which
+        are collected with the other subscription results of the simulation.
+        """
+        return len(self.sim_subscriptions.get(
+            tc.VAR_TELEPORT_STARTING_VEHICLES_IDS, ())) != 0
 
     def start_simulation(self, network, sim_params):
         """Start a SUMO simulation instance.
@@ -73,71 +120,38 @@ class TraCISimulation(KernelSimulation):
         This method uses the configuration files created by the network class
         to initialize a SUMO instance. It also initializes a traci connection to
         interface with SUMO from Python.
+
+        If requested in flow/config.py (USE_LIBSUMO) and libsumo is installed,
+        SUMO is instead run within the current process through libsumo, and
+        the libsumo module is used as the kernel API.
         """
+        # libsumo exposes the TraCI API through direct function calls, but
+        # cannot be used with sumo-gui or multiple clients
+        self.use_libsumo = config.USE_LIBSUMO and libsumo is not None \
+            and sim_params.render is not True and sim_params.num_clients == 1
+
+        # the port number that the SUMO instance will be run on
+        port = sim_params.port
+
+        # command used to start SUMO, which is the same for every retry
+        sumo_call = self._sumo_call(
+            network, sim_params, remote=not self.use_libsumo)
+
         error = None
         for _ in range(RETRIES_ON_ERROR):
             try:
-                # the port number that the SUMO instance will be run on
-                port = sim_params.port
-
-                sumo_binary = "sumo-gui" if sim_params.render is True \
-                    else "sumo"
-
-                # command used to start SUMO
-                sumo_call = [
-                    sumo_binary, "-c", network.cfg,
-                    "--remote-port", str(sim_params.port),
-                    "--num-clients", str(sim_params.num_clients),
-                    "--step-length", str(sim_params.sim_step)
-                ]
-
-                # add step logs (if requested)
-                if sim_params.no_step_log:
-                    sumo_call.append("--no-step-log")
-
-                # add the lateral resolution of the sublanes (if requested)
-                if sim_params.lateral_resolution is not None:
-                    sumo_call.append("--lateral-resolution")
-                    sumo_call.append(str(sim_params.lateral_resolution))
-
-                # add the emission path to the SUMO command (if requested)
-                if sim_params.emission_path is not None:
-                    ensure_dir(sim_params.emission_path)
-                    emission_out = os.path.join(
-                        sim_params.emission_path,
-                        "{0}-emission.xml".format(network.name))
-                    sumo_call.append("--emission-output")
-                    sumo_call.append(emission_out)
-                else:
-                    emission_out = None
-
-                if sim_params.overtake_right:
-                    sumo_call.append("--lanechange.overtake-right")
-                    sumo_call.append("true")
-
-                # specify a simulation seed (if requested)
-                if sim_params.seed is not None:
-                    sumo_call.append("--seed")
-                    sumo_call.append(str(sim_params.seed))
-
-                if not sim_params.print_warnings:
-                    sumo_call.append("--no-warnings")
-                    sumo_call.append("true")
-
-                # set the time it takes for a gridlock teleport to occur
-                sumo_call.append("--time-to-teleport")
-                sumo_call.append(str(int(sim_params.teleport_time)))
-
-                # check collisions at intersections
-                sumo_call.append("--collision.check-junctions")
-                sumo_call.append("true")
+                if self.use_libsumo:
+                    logging.info(" Starting SUMO through libsumo")
+                    libsumo.start(sumo_call)
+                    return libsumo
 
                 logging.info(" Starting SUMO on port " + str(port))
                 logging.debug(" Cfg file: " + str(network.cfg))
                 if sim_params.num_clients > 1:
                     logging.info(" Num clients are" +
                                  str(sim_params.num_clients))
-                logging.debug(" Emission file: " + str(emission_out))
+                logging.debug(" Emission path: " +
+                              str(sim_params.emission_path))
                 logging.debug(" Step length: " + str(sim_params.sim_step))
 
                 # Opening the I/O thread to SUMO
@@ -148,12 +162,9 @@ class TraCISimulation(KernelSimulation):
                 # before trying to connect with traci
                 if os.environ.get("TEST_FLAG", 0):
                     time.sleep(0.1)
-                else:
-                    time.sleep(config.SUMO_SLEEP)
 
-                traci_connection = traci.connect(port, numRetries=100)
+                traci_connection = self._connect(port)
                 traci_connection.setOrder(0)
-                traci_connection.simulationStep()
 
                 return traci_connection
             except Exception as e:
@@ -162,9 +173,186 @@ class TraCISimulation(KernelSimulation):
                 self.teardown_sumo()
         raise error
 
+    def _connect(self, port):
+        """Connect to the SUMO instance as soon as it opens its port.
+
+        Connections are attempted every CONNECT_INTERVAL seconds for up to
+        config.SUMO_SLEEP seconds, after which traci.connect (and its slower
+        retries) is used instead.
+
+        Parameters
+        ----------
+        port : int
+            the port the SUMO instance is run on
+
+        Returns
+        -------
+        traci.connection.Connection
+            the connection to the SUMO instance
+        """
+        for _ in range(int(config.SUMO_SLEEP / CONNECT_INTERVAL)):
+            try:
+                # a single attempt, without waiting or printing on failure
+                return traci.connect(port, numRetries=0)
+            except FatalTraCIError:
+                time.sleep(CONNECT_INTERVAL)
+
+        return traci.connect(port, numRetries=100)
+
+    def reset_simulation(self, network, sim_params):
+        """Reload the network in the running SUMO instance.
+
+        The running instance is reset through TraCI's load command, which
+        reparses the configuration files created by the network class without
+        restarting the SUMO binary and reconnecting with TraCI. A new instance
+        is started through `start_simulation` if there is no running instance
+        or if the reload fails.
+
+        Note that the instance cannot switch between sumo and sumo-gui when
+        reloaded, so the value of "render" should not change from True to
+        another value (or vice versa) between calls.
+
+        Parameters
+        ----------
+        network : flow.core.kernel.network.TraCIKernelNetwork
+            network kernel containing the paths to the configuration files
+        sim_params : flow.core.params.SumoParams
+            simulation-specific parameters
+
+        Returns
+        -------
+        traci.connection.Connection or libsumo
+            the kernel API, which is the current one if it was reused
+        """
+        if self.kernel_api is not None and \
+                (self.sumo_proc is not None or self.use_libsumo):
+            try:
+                # skip the binary, which is already running
+                self.kernel_api.load(
+                    self._sumo_call(network, sim_params, remote=False)[1:])
+                return self.kernel_api
+            except Exception:
+                print("Error during reload: {}".format(
+                    traceback.format_exc()))
+                self.teardown_sumo()
+
+        return self.start_simulation(network, sim_params)
+
+    def _sumo_call(self, network, sim_params, remote):
+        """Return the command used to start SUMO.
+
+        The command is only created again if the network or simulation
+        parameters it depends on changed since the last call, and a copy of
+        the previous command is returned otherwise.
+
+        Parameters
+        ----------
+        network : flow.core.kernel.network.TraCIKernelNetwork
+            network kernel containing the paths to the configuration files
+        sim_params : flow.core.params.SumoParams
+            simulation-specific parameters
+        remote : bool
+            whether to add the port and number of clients used by TraCI to
+            connect to the instance
+
+        Returns
+        -------
+        list of str
+            the SUMO binary, followed by its command line options
+        """
+        key = (network.cfg, network.name, remote, sim_params.render is True,
+               sim_params.port, sim_params.num_clients, sim_params.sim_step,
+               sim_params.no_step_log, sim_params.lateral_resolution,
+               sim_params.emission_path, sim_params.overtake_right,
+               sim_params.seed, sim_params.print_warnings,
+               sim_params.teleport_time,
+               getattr(sim_params, 'sumo_threads', None))
+        if key != self._sumo_call_key:
+            self._sumo_call_template = tuple(
+                self._create_sumo_call(network, sim_params, remote))
+            self._sumo_call_key = key
+        elif sim_params.emission_path is not None:
+            # the emission directory may have been removed since
+            ensure_dir(sim_params.emission_path)
+
+        return list(self._sumo_call_template)
+
+    @staticmethod
+    def _create_sumo_call(network, sim_params, remote):
+        """Create the command used to start SUMO.
+
+        See _sumo_call for a description of the parameters and return value.
+        """
+        sumo_binary = "sumo-gui" if sim_params.render is True else "sumo"
+
+        sumo_call = [sumo_binary, "-c", network.cfg]
+
+        # add the port that TraCI connects to (if not run in-process)
+        if remote:
+            sumo_call.extend([
+                "--remote-port", str(sim_params.port),
+                "--num-clients", str(sim_params.num_clients)
+            ])
+
+        sumo_call.append("--step-length")
+        sumo_call.append(str(sim_params.sim_step))
+
+        # add step logs (if requested)
+        if sim_params.no_step_log:
+            sumo_call.append("--no-step-log")
+
+        # add the lateral resolution of the sublanes (if requested)
+        if sim_params.lateral_resolution is not None:
+            sumo_call.append("--lateral-resolution")
+            sumo_call.append(str(sim_params.lateral_resolution))
+
+        # add the emission path to the SUMO command (if requested)
+        if sim_params.emission_path is not None:
+            ensure_dir(sim_params.emission_path)
+            emission_out = os.path.join(
+                sim_params.emission_path,
+                "{0}-emission.xml".format(network.name))
+            sumo_call.append("--emission-output")
+            sumo_call.append(emission_out)
+
+        if sim_params.overtake_right:
+            sumo_call.append("--lanechange.overtake-right")
+            sumo_call.append("true")
+
+        # specify a simulation seed (if requested)
+        if sim_params.seed is not None:
+            sumo_call.append("--seed")
+            sumo_call.append(str(sim_params.seed))
+
+        if not sim_params.print_warnings:
+            sumo_call.append("--no-warnings")
+            sumo_call.append("true")
+
+        # set the time it takes for a gridlock teleport to occur
+        sumo_call.append("--time-to-teleport")
+        sumo_call.append(str(int(sim_params.teleport_time)))
+
+        # check collisions at intersections
+        sumo_call.append("--collision.check-junctions")
+        sumo_call.append("true")
+
+        # parallelize the simulation and the rerouting (if requested). Params
+        # unpickled from older experiments may not have this attribute
+        sumo_threads = getattr(sim_params, 'sumo_threads', None)
+        if sumo_threads is not None:
+            sumo_call.append("--threads")
+            sumo_call.append(str(sumo_threads))
+            sumo_call.append("--device.rerouting.threads")
+            sumo_call.append(str(sumo_threads))
+
+        return sumo_call
+
     def teardown_sumo(self):
         """Kill the SUMO subprocess instance."""
         try:
-            os.killpg(self.sumo_proc.pid, signal.SIGTERM)
+            if self.use_libsumo:
+                libsumo.close()
+            else:
+                os.killpg(self.sumo_proc.pid, signal.SIGTERM)
         except Exception as e:
             print("Error during teardown: {}".format(e))
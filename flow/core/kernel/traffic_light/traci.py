@@ -50,11 +50,10 @@ class TraCITrafficLight(KernelTrafficLight):
 
     def update(self, reset):
         """See parent class."""
-        tls_obs = {}
-        for tl_id in self.__ids:
-            tls_obs[tl_id] = \
-                self.kernel_api.trafficlight.getSubscriptionResults(tl_id)
-        self.__tls = tls_obs.copy()
+        # subscription results collected by the simulation kernel during the
+        # last simulation step
+        tls_subs = self.master_kernel.simulation.tls_subscriptions
+        self.__tls = {tl_id: tls_subs.get(tl_id) for tl_id in self.__ids}
 
     def get_ids(self):
         """See parent class."""
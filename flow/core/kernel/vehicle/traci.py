@@ -3,7 +3,7 @@ import traceback
 
 from flow.core.kernel.vehicle import KernelVehicle
 import traci.constants as tc
-from traci.exceptions import FatalTraCIError, TraCIException
+from flow.core.kernel.simulation.traci import TRACI_ERRORS
 import numpy as np
 import collections
 import warnings
@@ -19,6 +19,9 @@ WHITE = (255, 255, 255)
 CYAN = (0, 255, 255)
 RED = (255, 0, 0)
 
+# number of vehicles the state arrays can hold before they are resized
+INITIAL_ROWS = 64
+
 
 class TraCIVehicle(KernelVehicle):
     """Flow kernel for the TraCI API.
@@ -47,6 +50,16 @@ class TraCIVehicle(KernelVehicle):
         # on the state of the vehicles for a given time step
         self.__sumo_obs = {}
 
+        # numeric subscription results of the vehicles, stored as arrays with
+        # one row per vehicle so that they can be gathered for many vehicles
+        # at once. Rows of vehicles that leave the network are reused.
+        self._rows = {}  # row of each vehicle in the arrays below
+        self._free_rows = list(range(INITIAL_ROWS - 1, -1, -1))
+        self._speed = np.zeros(INITIAL_ROWS)
+        self._default_speed = np.zeros(INITIAL_ROWS)
+        self._lane_pos = np.zeros(INITIAL_ROWS)
+        self._lane = np.zeros(INITIAL_ROWS, dtype=np.int32)
+
         # total number of vehicles in the network
         self.num_vehicles = 0
         # number of rl vehicles in the network
@@ -120,11 +133,12 @@ class TraCIVehicle(KernelVehicle):
             specifies whether the simulator was reset in the last simulation
             step
         """
-        vehicle_obs = {}
-        for veh_id in self.__ids:
-            vehicle_obs[veh_id] = \
-                self.kernel_api.vehicle.getSubscriptionResults(veh_id)
-        sim_obs = self.kernel_api.simulation.getSubscriptionResults()
+        # subscription results collected by the simulation kernel during the
+        # last simulation step
+        vehicle_subs = self.master_kernel.simulation.vehicle_subscriptions
+        vehicle_obs = {veh_id: vehicle_subs.get(veh_id)
+                       for veh_id in self.__ids}
+        sim_obs = self.master_kernel.simulation.sim_subscriptions
 
         # remove exiting vehicles from the vehicles class
         for veh_id in sim_obs[tc.VAR_ARRIVED_VEHICLES_IDS]:
@@ -173,10 +187,10 @@ class TraCIVehicle(KernelVehicle):
                         template_vehicles:
                     vals = deepcopy(self.master_kernel.network.network.
                                     template_vehicles[veh_id])
-                    # a step is executed during initialization, so add this sim
-                    # step to the departure time of vehicles
+                    # a step is executed during the reset, so add this sim step
+                    # to the departure time of vehicles
                     vals['depart'] = str(
-                        float(vals['depart']) + 2 * self.sim_step)
+                        float(vals['depart']) + self.sim_step)
                     self.kernel_api.vehicle.addFull(
                         veh_id, 'route{}_0'.format(veh_id), **vals)
         else:
@@ -230,6 +244,7 @@ class TraCIVehicle(KernelVehicle):
 
         # update the sumo observations variable
         self.__sumo_obs = vehicle_obs.copy()
+        self._update_rows()
 
         # update the lane leaders data for each vehicle
         self._multi_lane_headways()
@@ -237,6 +252,84 @@ class TraCIVehicle(KernelVehicle):
         # make sure the rl vehicle list is still sorted
         self.__rl_ids.sort()
 
+    def _update_rows(self):
+        """Copy the numeric subscription results into the state arrays."""
+        # free the rows of vehicles that are no longer observed
+        for veh_id in [veh_id for veh_id in self._rows
+                       if self.__sumo_obs.get(veh_id) is None]:
+            self._free_rows.append(self._rows.pop(veh_id))
+
+        rows, obs = [], []
+        for veh_id, veh_obs in self.__sumo_obs.items():
+            if veh_obs is not None:
+                row = self._rows.get(veh_id)
+                rows.append(self._new_row(veh_id) if row is None else row)
+                obs.append(veh_obs)
+
+        self._speed[rows] = [o[tc.VAR_SPEED] for o in obs]
+        self._default_speed[rows] = [o[tc.VAR_SPEED_WITHOUT_TRACI] for o in obs]
+        self._lane_pos[rows] = [o[tc.VAR_LANEPOSITION] for o in obs]
+        self._lane[rows] = [o[tc.VAR_LANE_INDEX] for o in obs]
+
+    def _set_row(self, veh_id, veh_obs):
+        """Store the numeric subscription results of a single vehicle."""
+        row = self._rows.get(veh_id)
+        if row is None:
+            row = self._new_row(veh_id)
+        self._speed[row] = veh_obs[tc.VAR_SPEED]
+        self._default_speed[row] = veh_obs[tc.VAR_SPEED_WITHOUT_TRACI]
+        self._lane_pos[row] = veh_obs[tc.VAR_LANEPOSITION]
+        self._lane[row] = veh_obs[tc.VAR_LANE_INDEX]
+
+    def _new_row(self, veh_id):
+        """Assign a row of the state arrays to a vehicle.
+
+        The arrays are doubled in size if all their rows are in use.
+        """
+        if not self._free_rows:
+            num_rows = len(self._speed)
+            self._speed = np.concatenate(
+                (self._speed, np.zeros_like(self._speed)))
+            self._default_speed = np.concatenate(
+                (self._default_speed, np.zeros_like(self._default_speed)))
+            self._lane_pos = np.concatenate(
+                (self._lane_pos, np.zeros_like(self._lane_pos)))
+            self._lane = np.concatenate(
+                (self._lane, np.zeros_like(self._lane)))
+            self._free_rows = list(range(2 * num_rows - 1, num_rows - 1, -1))
+
+        row = self._free_rows.pop()
+        self._rows[veh_id] = row
+        return row
+
+    def _gather(self, values, veh_ids, error):
+        """Return the values of several vehicles from a state array.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            state array, with one row per vehicle
+        veh_ids : list of str or np.ndarray
+            vehicle identifiers
+        error : Any
+            value returned for vehicles that are not in the network
+
+        Returns
+        -------
+        list
+            the value of each vehicle
+        """
+        rows = np.fromiter((self._rows.get(veh_id, -1) for veh_id in veh_ids),
+                           dtype=np.int64, count=len(veh_ids))
+        found = rows >= 0
+        if found.all():
+            return values[rows].tolist()
+        result = [error] * len(rows)
+        for i, value in zip(np.flatnonzero(found),
+                            values[rows[found]].tolist()):
+            result[i] = value
+        return result
+
     def _add_departed(self, veh_id, veh_type):
         """Add a vehicle that entered the network from an inflow or reset.
 
@@ -331,22 +424,15 @@ class TraCIVehicle(KernelVehicle):
             "lane_change_params"].lane_change_mode
         self.kernel_api.vehicle.setLaneChangeMode(veh_id, lc_mode)
 
-        # get initial state info
-        self.__sumo_obs[veh_id] = dict()
-        self.__sumo_obs[veh_id][tc.VAR_ROAD_ID] = \
-            self.kernel_api.vehicle.getRoadID(veh_id)
-        self.__sumo_obs[veh_id][tc.VAR_LANEPOSITION] = \
-            self.kernel_api.vehicle.getLanePosition(veh_id)
-        self.__sumo_obs[veh_id][tc.VAR_LANE_INDEX] = \
-            self.kernel_api.vehicle.getLaneIndex(veh_id)
-        self.__sumo_obs[veh_id][tc.VAR_SPEED] = \
-            self.kernel_api.vehicle.getSpeed(veh_id)
-
         # make sure that the order of rl_ids is kept sorted
         self.__rl_ids.sort()
 
-        # get the subscription results from the new vehicle
+        # get the subscription results from the new vehicle. These are
+        # returned by SUMO when subscribing, and are also used as the initial
+        # state info, instead of querying each variable separately
         new_obs = self.kernel_api.vehicle.getSubscriptionResults(veh_id)
+        self.__sumo_obs[veh_id] = dict(new_obs)
+        self._set_row(veh_id, new_obs)
 
         return new_obs
 
@@ -366,6 +452,8 @@ class TraCIVehicle(KernelVehicle):
 
         if veh_id in self.__sumo_obs:
             del self.__sumo_obs[veh_id]
+        if veh_id in self._rows:
+            self._free_rows.append(self._rows.pop(veh_id))
 
         # remove it from all other id lists (if it is there)
         if veh_id in self.__human_ids:
@@ -386,6 +474,7 @@ class TraCIVehicle(KernelVehicle):
     def test_set_speed(self, veh_id, speed):
         """Set the speed of the specified vehicle."""
         self.__sumo_obs[veh_id][tc.VAR_SPEED] = speed
+        self._speed[self._rows[veh_id]] = speed
 
     def test_set_edge(self, veh_id, edge):
         """Set the speed of the specified vehicle."""
@@ -504,21 +593,23 @@ class TraCIVehicle(KernelVehicle):
     def get_speed(self, veh_id, error=-1001):
         """See parent class."""
         if isinstance(veh_id, (list, np.ndarray)):
-            return [self.get_speed(vehID, error) for vehID in veh_id]
-        return self.__sumo_obs.get(veh_id, {}).get(tc.VAR_SPEED, error)
+            return self._gather(self._speed, veh_id, error)
+        row = self._rows.get(veh_id)
+        return error if row is None else float(self._speed[row])
 
     def get_default_speed(self, veh_id, error=-1001):
         """See parent class."""
         if isinstance(veh_id, (list, np.ndarray)):
-            return [self.get_default_speed(vehID, error) for vehID in veh_id]
-        return self.__sumo_obs.get(veh_id, {}).get(tc.VAR_SPEED_WITHOUT_TRACI,
-                                                   error)
+            return self._gather(self._default_speed, veh_id, error)
+        row = self._rows.get(veh_id)
+        return error if row is None else float(self._default_speed[row])
 
     def get_position(self, veh_id, error=-1001):
         """See parent class."""
         if isinstance(veh_id, (list, np.ndarray)):
-            return [self.get_position(vehID, error) for vehID in veh_id]
-        return self.__sumo_obs.get(veh_id, {}).get(tc.VAR_LANEPOSITION, error)
+            return self._gather(self._lane_pos, veh_id, error)
+        row = self._rows.get(veh_id)
+        return error if row is None else float(self._lane_pos[row])
 
     def get_edge(self, veh_id, error=""):
         """See parent class."""
@@ -529,8 +620,9 @@ class TraCIVehicle(KernelVehicle):
     def get_lane(self, veh_id, error=-1001):
         """See parent class."""
         if isinstance(veh_id, (list, np.ndarray)):
-            return [self.get_lane(vehID, error) for vehID in veh_id]
-        return self.__sumo_obs.get(veh_id, {}).get(tc.VAR_LANE_INDEX, error)
+            return self._gather(self._lane, veh_id, error)
+        row = self._rows.get(veh_id)
+        return error if row is None else int(self._lane[row])
 
     def get_route(self, veh_id, error=None):
         """See parent class."""
@@ -980,7 +1072,7 @@ class TraCIVehicle(KernelVehicle):
             try:
                 # color rl vehicles red
                 self.set_color(veh_id=veh_id, color=RED)
-            except (FatalTraCIError, TraCIException) as e:
+            except TRACI_ERRORS as e:
                 print('Error when updating rl vehicle colors:', e)
 
         # color vehicles white if not observed and cyan if observed
@@ -988,7 +1080,7 @@ class TraCIVehicle(KernelVehicle):
             try:
                 color = CYAN if veh_id in self.get_observed_ids() else WHITE
                 self.set_color(veh_id=veh_id, color=color)
-            except (FatalTraCIError, TraCIException) as e:
+            except TRACI_ERRORS as e:
                 print('Error when updating human vehicle colors:', e)
 
         # clear the list of observed vehicles
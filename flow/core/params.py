@@ -556,6 +556,9 @@ class SumoParams(SimParams):
         they teleport after teleport_time seconds
     num_clients : int, optional
         Number of clients that will connect to Traci
+    sumo_threads : int, optional
+        Number of threads used by SUMO to run the simulation and reroute
+        vehicles. Defaults to None, in which case SUMO's defaults are used.
     """
 
     def __init__(self,
@@ -574,7 +577,8 @@ class SumoParams(SimParams):
                  restart_instance=False,
                  print_warnings=True,
                  teleport_time=-1,
-                 num_clients=1):
+                 num_clients=1,
+                 sumo_threads=None):
         """Instantiate SumoParams."""
         super(SumoParams, self).__init__(
             sim_step, render, restart_instance, emission_path, save_render,
@@ -587,6 +591,7 @@ class SumoParams(SimParams):
         self.print_warnings = print_warnings
         self.teleport_time = teleport_time
         self.num_clients = num_clients
+        self.sumo_threads = sumo_threads
 
 
 class EnvParams:
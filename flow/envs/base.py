@@ -13,15 +13,15 @@ from flow.utils.flow_warnings import deprecated_attribute
 import gym
 from gym.spaces import Box
 from gym.spaces import Tuple
-from traci.exceptions import FatalTraCIError
-from traci.exceptions import TraCIException
 
 import sumolib
 
 
 from flow.core.util import ensure_dir
 from flow.core.kernel import Kernel
+from flow.core.kernel.simulation.traci import TRACI_ERRORS
 from flow.utils.exceptions import FatalFlowError
+from flow.controllers.base_controller import get_actions
 
 
 class Env(gym.Env):
@@ -142,6 +142,9 @@ class Env(gym.Env):
         self.initial_state = {}
         self.state = None
         self.obs_var_labels = []
+        # data type of the observations, set from the observation space the
+        # first time an observation is returned
+        self._obs_dtype = None
 
         # simulation step size
         self.sim_step = sim_params.sim_step
@@ -236,11 +239,20 @@ class Env(gym.Env):
         render : bool, optional
             specifies whether to use the gui
         """
-        self.k.close()
+        # a running sumo instance can be reloaded instead of restarted, unless
+        # the gui needs to be started or stopped
+        reload_sumo = self.simulator == 'traci' and (
+            render is None or (render is True) == (self.sim_params.render is True))
+
+        if reload_sumo:
+            # keep the sumo instance running, and only clear the network files
+            self.k.network.close()
+        else:
+            self.k.close()
 
-        # killed the sumo process if using sumo/TraCI
-        if self.simulator == 'traci':
-            self.k.simulation.sumo_proc.kill()
+            # killed the sumo process if using sumo/TraCI
+            if self.simulator == 'traci' and not self.k.simulation.use_libsumo:
+                self.k.simulation.sumo_proc.kill()
 
         if render is not None:
             self.sim_params.render = render
@@ -251,8 +263,12 @@ class Env(gym.Env):
 
         self.k.network.generate_network(self.network)
         self.k.vehicle.initialize(deepcopy(self.network.vehicles))
-        kernel_api = self.k.simulation.start_simulation(
-            network=self.k.network, sim_params=self.sim_params)
+        if reload_sumo:
+            kernel_api = self.k.simulation.reset_simulation(
+                network=self.k.network, sim_params=self.sim_params)
+        else:
+            kernel_api = self.k.simulation.start_simulation(
+                network=self.k.network, sim_params=self.sim_params)
         self.k.pass_api(kernel_api)
 
         self.setup_initial_state()
@@ -318,11 +334,10 @@ class Env(gym.Env):
 
             # perform acceleration actions for controlled human-driven vehicles
             if len(self.k.vehicle.get_controlled_ids()) > 0:
-                accel = []
-                for veh_id in self.k.vehicle.get_controlled_ids():
-                    action = self.k.vehicle.get_acc_controller(
-                        veh_id).get_action(self)
-                    accel.append(action)
+                accel = get_actions(
+                    [self.k.vehicle.get_acc_controller(veh_id)
+                     for veh_id in self.k.vehicle.get_controlled_ids()],
+                    self)
                 self.k.vehicle.apply_acceleration(
                     self.k.vehicle.get_controlled_ids(), accel)
 
@@ -381,7 +396,7 @@ class Env(gym.Env):
         self.state = np.asarray(states).T
 
         # collect observation new state associated with action
-        next_observation = np.copy(states)
+        next_observation = self._copy_observation(states)
 
         # test if the environment should terminate due to a collision or the
         # time horizon being met
@@ -454,7 +469,7 @@ class Env(gym.Env):
             for veh_id in self.k.kernel_api.vehicle.getIDList():  # FIXME: hack
                 try:
                     self.k.vehicle.remove(veh_id)
-                except (FatalTraCIError, TraCIException):
+                except TRACI_ERRORS:
                     print(traceback.format_exc())
 
         # clear all vehicles from the network and the vehicles class
@@ -466,7 +481,7 @@ class Env(gym.Env):
                 continue
             try:
                 self.k.vehicle.remove(veh_id)
-            except (FatalTraCIError, TraCIException):
+            except TRACI_ERRORS:
                 print("Error during start: {}".format(traceback.format_exc()))
 
         # reintroduce the initial vehicles to the network
@@ -482,7 +497,7 @@ class Env(gym.Env):
                     lane=lane_index,
                     pos=pos,
                     speed=speed)
-            except (FatalTraCIError, TraCIException):
+            except TRACI_ERRORS:
                 # if a vehicle was not removed in the first attempt, remove it
                 # now and then reintroduce it
                 self.k.vehicle.remove(veh_id)
@@ -527,7 +542,7 @@ class Env(gym.Env):
         self.state = np.asarray(states).T
 
         # observation associated with the reset (no warm-up steps)
-        observation = np.copy(states)
+        observation = self._copy_observation(states)
 
         # perform (optional) warm-up steps before training
         for _ in range(self.env_params.warmup_steps):
@@ -538,6 +553,32 @@ class Env(gym.Env):
 
         return observation
 
+    def _copy_observation(self, states):
+        """Return a copy of the states, in the data type of the observations.
+
+        The states of Box observation spaces are cast to the data type of the
+        space (float32 for Flow's environments), which is the type the
+        policies and the vectorized environments work with. Other states are
+        copied unchanged.
+
+        Parameters
+        ----------
+        states : array_like
+            output of the get_state method
+
+        Returns
+        -------
+        array_like
+            observation of the environment
+        """
+        if self._obs_dtype is None:
+            space = self.observation_space
+            self._obs_dtype = space.dtype if isinstance(space, Box) else False
+
+        if self._obs_dtype is False:
+            return np.copy(states)
+        return np.array(states, dtype=self._obs_dtype)
+
     def additional_command(self):
         """Additional commands that may be performed by the step method."""
         pass
@@ -6,13 +6,13 @@ import random
 import traceback
 from gym.spaces import Box
 
-from traci.exceptions import FatalTraCIError
-from traci.exceptions import TraCIException
 
 from ray.rllib.env import MultiAgentEnv
 
 from flow.envs.base import Env
+from flow.core.kernel.simulation.traci import TRACI_ERRORS
 from flow.utils.exceptions import FatalFlowError
+from flow.controllers.base_controller import get_actions
 
 
 class MultiEnv(MultiAgentEnv, Env):
@@ -54,11 +54,10 @@ class MultiEnv(MultiAgentEnv, Env):
 
             # perform acceleration actions for controlled human-driven vehicles
             if len(self.k.vehicle.get_controlled_ids()) > 0:
-                accel = []
-                for veh_id in self.k.vehicle.get_controlled_ids():
-                    accel_contr = self.k.vehicle.get_acc_controller(veh_id)
-                    action = accel_contr.get_action(self)
-                    accel.append(action)
+                accel = get_actions(
+                    [self.k.vehicle.get_acc_controller(veh_id)
+                     for veh_id in self.k.vehicle.get_controlled_ids()],
+                    self)
                 self.k.vehicle.apply_acceleration(
                     self.k.vehicle.get_controlled_ids(), accel)
 
@@ -177,7 +176,7 @@ class MultiEnv(MultiAgentEnv, Env):
             for veh_id in self.k.kernel_api.vehicle.getIDList():  # FIXME: hack
                 try:
                     self.k.vehicle.remove(veh_id)
-                except (FatalTraCIError, TraCIException):
+                except TRACI_ERRORS:
                     print(traceback.format_exc())
 
         # clear all vehicles from the network and the vehicles class
@@ -189,7 +188,7 @@ class MultiEnv(MultiAgentEnv, Env):
                 continue
             try:
                 self.k.vehicle.remove(veh_id)
-            except (FatalTraCIError, TraCIException):
+            except TRACI_ERRORS:
                 print("Error during start: {}".format(traceback.format_exc()))
 
         # reintroduce the initial vehicles to the network
@@ -205,7 +204,7 @@ class MultiEnv(MultiAgentEnv, Env):
                     lane=lane_index,
                     pos=pos,
                     speed=speed)
-            except (FatalTraCIError, TraCIException):
+            except TRACI_ERRORS:
                 # if a vehicle was not removed in the first attempt, remove it
                 # now and then reintroduce it
                 self.k.vehicle.remove(veh_id)
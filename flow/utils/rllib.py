@@ -130,7 +130,8 @@ def get_flow_params(config):
 
     # convert all parameters from dict to their object form
     sim = SumoParams()  # TODO: add check for simulation type
-    sim.__dict__ = flow_params["sim"].copy()
+    # keep the default values of parameters added after the file was saved
+    sim.__dict__.update(flow_params["sim"])
 
     net = NetParams()
     net.__dict__ = flow_params["net"].copy()
@@ -0,0 +1,272 @@
+"""Vectorized environment wrappers for running Flow with stable-baselines."""
+
+import collections
+import ctypes
+import multiprocessing
+
+import numpy as np
+from stable_baselines.common.vec_env import VecEnv
+from stable_baselines.common.vec_env.base_vec_env import CloudpickleWrapper
+
+# ctypes equivalents of the numpy dtypes supported by the shared buffers
+_NP_TO_CT = {
+    np.float32: ctypes.c_float,
+    np.float64: ctypes.c_double,
+    np.int32: ctypes.c_int32,
+    np.int8: ctypes.c_int8,
+    np.uint8: ctypes.c_char,
+    np.bool_: ctypes.c_bool,
+}
+
+
+def _close_env(env):
+    """Close an environment, and its simulator if it is a Flow environment."""
+    if hasattr(env.unwrapped, 'terminate'):
+        env.unwrapped.terminate()
+    else:
+        env.close()
+
+
+def _shmem_worker(remote, parent_remote, env_fn_wrapper, obs_buf, start,
+                  obs_shape, obs_dtype):
+    """Run a group of environments sequentially in a subprocess.
+
+    Observations are written in place into the rows of the shared buffer
+    assigned to this worker, so that only the rewards, dones, and infos are
+    sent back through the pipe.
+    """
+    parent_remote.close()
+    envs = [env_fn() for env_fn in env_fn_wrapper.var]
+    obs = np.frombuffer(obs_buf, dtype=obs_dtype).reshape(
+        (-1,) + obs_shape)[start:start + len(envs)]
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == 'step':
+                results = []
+                for i, (env, action) in enumerate(zip(envs, data)):
+                    observation, reward, done, info = env.step(action)
+                    if done:
+                        # save the final observation, as it is overwritten by
+                        # the reset below
+                        info['terminal_observation'] = observation
+                        observation = env.reset()
+                    obs[i] = observation
+                    results.append((reward, done, info))
+                remote.send(results)
+            elif cmd == 'reset':
+                for i, env in enumerate(envs):
+                    obs[i] = env.reset()
+                remote.send(start)
+            elif cmd == 'close':
+                remote.close()
+                break
+            elif cmd == 'env_method':
+                indices, (name, args, kwargs) = data
+                remote.send([getattr(envs[i], name)(*args, **kwargs)
+                             for i in indices])
+            elif cmd == 'get_attr':
+                indices, name = data
+                remote.send([getattr(envs[i], name) for i in indices])
+            elif cmd == 'set_attr':
+                indices, (name, value) = data
+                remote.send([setattr(envs[i], name, value) for i in indices])
+            else:
+                raise NotImplementedError
+    except KeyboardInterrupt:
+        print('ShmemVecEnv worker: got KeyboardInterrupt')
+    finally:
+        for env in envs:
+            _close_env(env)
+
+
+class ShmemVecEnv(VecEnv):
+    """Multiprocess vectorized environment with shared-memory observations.
+
+    Similar to stable_baselines.common.vec_env.SubprocVecEnv, but the
+    observations of every environment are written by the workers directly
+    into a shared ``multiprocessing.RawArray``. This avoids pickling the
+    observation arrays through the pipes every step, which otherwise limits
+    the throughput of rollouts on machines with many cores.
+
+    Parameters
+    ----------
+    env_fns : list of function
+        environment constructors, one per subprocess
+    start_method : str, optional
+        method used to start the subprocesses, must be one of the methods
+        returned by multiprocessing.get_all_start_methods(). Defaults to
+        "forkserver" when available, and "spawn" otherwise.
+    """
+
+    def __init__(self, env_fns, start_method=None):
+        """Instantiate the vectorized environment and start the workers."""
+        self._setup(env_fns, 1, start_method)
+
+    def _setup(self, env_fns, envs_per_proc, start_method):
+        """Allocate the shared observations and start the workers.
+
+        Parameters
+        ----------
+        env_fns : list of function
+            environment constructors
+        envs_per_proc : int
+            number of environments run by each subprocess. The last
+            subprocess may run fewer environments if the number of
+            constructors is not a multiple of this value.
+        start_method : str
+            see class definition
+        """
+        self.waiting = False
+        self.closed = False
+
+        # collect the spaces from a single instance of the environment
+        dummy = env_fns[0]()
+        observation_space = dummy.observation_space
+        action_space = dummy.action_space
+        _close_env(dummy)
+        VecEnv.__init__(self, len(env_fns), observation_space, action_space)
+
+        if start_method is None:
+            forkserver_available = \
+                'forkserver' in multiprocessing.get_all_start_methods()
+            start_method = 'forkserver' if forkserver_available else 'spawn'
+        ctx = multiprocessing.get_context(start_method)
+
+        # allocate a single shared buffer containing the observations of all
+        # environments
+        self.obs_shape = observation_space.shape
+        self.obs_dtype = observation_space.dtype
+        self.obs_buf = ctx.RawArray(
+            _NP_TO_CT[self.obs_dtype.type],
+            self.num_envs * int(np.prod(self.obs_shape)))
+        self.obs = np.frombuffer(self.obs_buf, dtype=self.obs_dtype).reshape(
+            (self.num_envs,) + self.obs_shape)
+
+        # first environment index of each subprocess
+        self.starts = list(range(0, self.num_envs, envs_per_proc))
+        self.envs_per_proc = envs_per_proc
+
+        self.remotes, self.work_remotes = zip(
+            *[ctx.Pipe() for _ in range(len(self.starts))])
+        self.processes = []
+        for work_remote, remote, start in zip(
+                self.work_remotes, self.remotes, self.starts):
+            group = env_fns[start:start + envs_per_proc]
+            args = (work_remote, remote, CloudpickleWrapper(group),
+                    self.obs_buf, start, self.obs_shape, self.obs_dtype)
+            # daemon=True: if the main process crashes, we should not cause
+            # things to hang
+            process = ctx.Process(target=_shmem_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+    def step_async(self, actions):
+        """See parent class."""
+        for remote, start in zip(self.remotes, self.starts):
+            remote.send(('step', actions[start:start + self.envs_per_proc]))
+        self.waiting = True
+
+    def step_wait(self):
+        """See parent class."""
+        results = [result for remote in self.remotes
+                   for result in remote.recv()]
+        self.waiting = False
+        rews, dones, infos = zip(*results)
+        return np.copy(self.obs), np.stack(rews), np.stack(dones), infos
+
+    def reset(self):
+        """See parent class."""
+        for remote in self.remotes:
+            remote.send(('reset', None))
+        for remote in self.remotes:
+            remote.recv()
+        return np.copy(self.obs)
+
+    def close(self):
+        """See parent class."""
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        """See parent class."""
+        return self._call_targets('get_attr', attr_name, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        """See parent class."""
+        self._call_targets('set_attr', (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None,
+                   **method_kwargs):
+        """See parent class."""
+        return self._call_targets(
+            'env_method', (method_name, method_args, method_kwargs), indices)
+
+    def _call_targets(self, cmd, data, indices):
+        """Send a command to the environments of the given indices.
+
+        Parameters
+        ----------
+        cmd : str
+            name of the command, one of {"get_attr", "set_attr",
+            "env_method"}
+        data : Any
+            arguments of the command
+        indices : None, int, or list of int
+            refers to indices of environments
+
+        Returns
+        -------
+        list
+            results of the command for each environment, in the order of the
+            indices
+        """
+        # group the requested environments by subprocess
+        targets = collections.OrderedDict()
+        for i in self._get_indices(indices):
+            remote = self.remotes[i // self.envs_per_proc]
+            targets.setdefault(remote, []).append(i % self.envs_per_proc)
+
+        for remote, local_indices in targets.items():
+            remote.send((cmd, (local_indices, data)))
+        results = {}
+        for remote, local_indices in targets.items():
+            results[remote] = iter(remote.recv())
+
+        return [next(results[self.remotes[i // self.envs_per_proc]])
+                for i in self._get_indices(indices)]
+
+
+class GroupedSubprocVecEnv(ShmemVecEnv):
+    """Vectorized environment running several environments per subprocess.
+
+    The time needed to step a SUMO instance varies with the number of
+    vehicles it holds, so a vectorized environment with one environment per
+    subprocess waits every step for its slowest instance. Stepping several
+    environments sequentially within each subprocess concentrates the time
+    taken by each subprocess around the mean rather than the max, and reduces
+    the number of messages sent through the pipes.
+
+    Parameters
+    ----------
+    env_fns : list of function
+        environment constructors, partitioned into groups of `envs_per_proc`
+        environments, each group run by one subprocess
+    envs_per_proc : int
+        number of environments run by each subprocess
+    start_method : str, optional
+        see parent class
+    """
+
+    def __init__(self, env_fns, envs_per_proc, start_method=None):
+        """Instantiate the vectorized environment and start the workers."""
+        self._setup(env_fns, envs_per_proc, start_method)
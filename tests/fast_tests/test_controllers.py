@@ -9,6 +9,7 @@ from flow.controllers.routing_controllers import ContinuousRouter
 from flow.controllers.car_following_models import IDMController, \
     OVMController, BCMController, LinearOVM, CFMController, LACController
 from flow.controllers import FollowerStopper, PISaturation
+from flow.controllers.base_controller import get_actions
 from tests.setup_scripts import ring_road_exp_setup
 import os
 import numpy as np
@@ -283,6 +284,47 @@ class TestIDMController(unittest.TestCase):
             for veh_id in ids
         ]
 
+    def test_get_accels(self):
+        self.env.reset()
+        ids = self.env.k.vehicle.get_ids()
+
+        test_headways = [10, 20, 0, 40, 50]
+        for i, veh_id in enumerate(ids):
+            self.env.k.vehicle.set_headway(veh_id, test_headways[i])
+
+        # make sure that the accelerations computed at once match the ones
+        # computed separately for each vehicle
+        controllers = [self.env.k.vehicle.get_acc_controller(veh_id)
+                       for veh_id in ids]
+        np.testing.assert_array_almost_equal(
+            IDMController.get_accels(controllers, self.env),
+            [controller.get_accel(self.env) for controller in controllers])
+
+    def test_get_actions_overridden_get_action(self):
+        """Check controllers overriding get_action(env) are still supported."""
+        self.env.reset()
+        ids = self.env.k.vehicle.get_ids()
+
+        controllers = [ConstantActionIDMController(
+            veh_id, car_following_params=SumoCarFollowingParams())
+            for veh_id in ids[:2]]
+        controllers += [self.env.k.vehicle.get_acc_controller(veh_id)
+                        for veh_id in ids[2:]]
+        actions = get_actions(controllers, self.env)
+
+        self.assertEqual(actions[:2], [1, 1])
+        self.assertEqual(
+            actions[2:],
+            [controller.get_action(self.env) for controller in controllers[2:]])
+
+
+class ConstantActionIDMController(IDMController):
+    """IDM controller overriding get_action with its former signature."""
+
+    def get_action(self, env):
+        """Return a constant action."""
+        return 1
+
 
 class TestInstantaneousFailsafe(unittest.TestCase):
     """
@@ -9,6 +9,8 @@ from flow.controllers.car_following_models import IDMController
 from flow.controllers import RLController
 from flow.envs.ring.accel import ADDITIONAL_ENV_PARAMS
 from flow.utils.exceptions import FatalFlowError
+from flow.core.kernel.simulation.traci import TRACI_ERRORS, libsumo
+from traci.exceptions import FatalTraCIError, TraCIException
 from flow.envs import Env, TestEnv
 
 from tests.setup_scripts import ring_road_exp_setup, highway_exp_setup
@@ -303,6 +305,117 @@ class TestSimsPerStep(unittest.TestCase):
         self.assertEqual(t2 - t1, sims_per_step)
 
 
+class TestStartSimulation(unittest.TestCase):
+    """Tests that a SUMO instance is started and connected to through TraCI."""
+
+    def test_start_simulation(self):
+        env, _ = ring_road_exp_setup()
+
+        # the environment is connected to a running SUMO instance
+        self.assertIsNotNone(env.k.simulation.sumo_proc)
+        self.assertIsNone(env.k.simulation.sumo_proc.poll())
+        self.assertAlmostEqual(env.k.kernel_api.simulation.getDeltaT(),
+                               env.sim_step)
+
+        # the instance can be stepped through the connection
+        env.reset()
+        env.step(rl_actions=None)
+        self.assertEqual(len(env.k.vehicle.get_ids()),
+                         env.initial_vehicles.num_vehicles)
+
+        env.terminate()
+
+
+class TestRestartInstance(unittest.TestCase):
+    """Tests resets with restart_instance set to True.
+
+    The running SUMO instance is expected to be reloaded, and a new instance
+    to be started if reloading fails.
+    """
+
+    def setUp(self):
+        sim_params = SumoParams(sim_step=0.1, restart_instance=True)
+        self.env, _ = ring_road_exp_setup(sim_params=sim_params)
+
+    def tearDown(self):
+        self.env.terminate()
+        self.env = None
+
+    def test_reload(self):
+        self.env.reset()
+        sumo_proc = self.env.k.simulation.sumo_proc
+        kernel_api = self.env.k.kernel_api
+
+        for _ in range(2):
+            self.env.step(rl_actions=None)
+            self.env.reset()
+
+            # the same instance and connection are used
+            self.assertIs(self.env.k.simulation.sumo_proc, sumo_proc)
+            self.assertEqual(self.env.k.simulation.sumo_proc.pid,
+                             sumo_proc.pid)
+            self.assertIs(self.env.k.kernel_api, kernel_api)
+
+            # all initial vehicles are back in the network
+            self.assertCountEqual(self.env.k.vehicle.get_ids(),
+                                  self.env.initial_ids)
+            self.assertCountEqual(kernel_api.vehicle.getIDList(),
+                                  self.env.initial_ids)
+
+    def test_failed_reload(self):
+        self.env.reset()
+        sumo_proc = self.env.k.simulation.sumo_proc
+        kernel_api = self.env.k.kernel_api
+
+        def load(args):
+            raise TraCIException("failed to load")
+
+        kernel_api.load = load
+        self.env.step(rl_actions=None)
+        self.env.reset()
+
+        # a new instance was started instead
+        self.assertIsNot(self.env.k.simulation.sumo_proc, sumo_proc)
+        self.assertNotEqual(self.env.k.simulation.sumo_proc.pid,
+                            sumo_proc.pid)
+        self.assertIsNot(self.env.k.kernel_api, kernel_api)
+        self.assertIsNone(self.env.k.simulation.sumo_proc.poll())
+        sumo_proc.wait(timeout=10)
+
+        # all initial vehicles are in the new instance
+        self.assertCountEqual(self.env.k.vehicle.get_ids(),
+                              self.env.initial_ids)
+        self.assertCountEqual(self.env.k.kernel_api.vehicle.getIDList(),
+                              self.env.initial_ids)
+
+
+class TestKernelErrors(unittest.TestCase):
+    """Tests that the errors of both traci and libsumo are handled."""
+
+    def test_traci_errors(self):
+        self.assertIn(TraCIException, TRACI_ERRORS)
+        self.assertIn(FatalTraCIError, TRACI_ERRORS)
+        if libsumo is not None:
+            self.assertIn(libsumo.TraCIException, TRACI_ERRORS)
+            self.assertIn(libsumo.FatalTraCIError, TRACI_ERRORS)
+
+
+class TestObservationDtype(unittest.TestCase):
+    """Tests that observations match the data type of the observation space."""
+
+    def test_float32(self):
+        _, network = ring_road_exp_setup()
+        env = TestEnv(EnvParams(), SumoParams(), network)
+
+        obs = env.reset()
+        self.assertEqual(obs.dtype, np.float32)
+
+        obs, _, _, _ = env.step(rl_actions=None)
+        self.assertEqual(obs.dtype, np.float32)
+
+        env.terminate()
+
+
 class TestAbstractMethods(unittest.TestCase):
     """
     These series of tests are meant to ensure that the environment abstractions
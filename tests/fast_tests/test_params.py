@@ -97,7 +97,8 @@ class TestSumoParams(unittest.TestCase):
              seed=204,
              restart_instance=True,
              print_warnings=False,
-             teleport_time=-1)
+             teleport_time=-1,
+             sumo_threads=4)
 
         # ensure that the attributes match their correct values
         self.assertEqual(params.port, None)
@@ -115,6 +116,7 @@ class TestSumoParams(unittest.TestCase):
         self.assertEqual(params.restart_instance, True)
         self.assertEqual(params.print_warnings, False)
         self.assertEqual(params.teleport_time, -1)
+        self.assertEqual(params.sumo_threads, 4)
 
 
 class TestSumoCarFollowingParams(unittest.TestCase):
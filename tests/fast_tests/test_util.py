@@ -4,18 +4,27 @@ import os
 import json
 import collections
 
+import gym
+import numpy as np
+from gym.spaces import Box
+
 from flow.core.params import VehicleParams
 from flow.core.params import TrafficLightParams
 from flow.controllers import IDMController, ContinuousRouter, RLController
 from flow.core.params import SumoParams, EnvParams, NetParams, InitialConfig, \
     InFlows, SumoCarFollowingParams
 from flow.core.util import emission_to_csv
+from flow.core.kernel.simulation import TraCISimulation
 from flow.utils.flow_warnings import deprecated_attribute
 from flow.utils.registry import make_create_env
 from flow.utils.rllib import FlowParamsEncoder, get_flow_params
+from flow.utils.vec_env import ShmemVecEnv, GroupedSubprocVecEnv
 
 os.environ["TEST_FLAG"] = "True"
 
+# the attributes of the network kernel used to create the SUMO command
+NetworkNamespace = collections.namedtuple('NetworkNamespace', ['cfg', 'name'])
+
 
 class TestEmissionToCSV(unittest.TestCase):
     """Tests the emission_to_csv function on a small file.
@@ -336,6 +345,108 @@ class TestRllib(unittest.TestCase):
         self.assertTrue(search_dicts(imported_flow_params["veh"].__dict__,
                                      flow_params["veh"].__dict__))
 
+    def test_get_flow_params_saved_before_new_params(self):
+        """Tests loading parameters saved before some parameters existed.
+
+        The saved simulation parameters do not contain "sumo_threads", which
+        should be set to its default value when loaded, and should not be
+        needed to create the command used to start SUMO.
+        """
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        with open(os.path.join(dir_path, '../data/rllib_data/single_agent/'
+                               'params.json')) as f:
+            config = json.load(f)
+        self.assertNotIn('sumo_threads', json.loads(
+            config['env_config']['flow_params'])['sim'])
+
+        flow_params = get_flow_params(config)
+        self.assertIsNone(flow_params['sim'].sumo_threads)
+
+        network = NetworkNamespace(cfg='test.sumo.cfg', name='test')
+        sumo_call = TraCISimulation(None)._sumo_call(
+            network, flow_params['sim'], remote=True)
+        self.assertEqual(sumo_call[:3], ['sumo', '-c', 'test.sumo.cfg'])
+        self.assertNotIn('--threads', sumo_call)
+
+
+class CountingEnv(gym.Env):
+    """A mock-up environment whose observation is (offset, time step)."""
+
+    observation_space = Box(low=0, high=float('inf'), shape=(2,),
+                            dtype=np.float32)
+    action_space = Box(low=-1, high=1, shape=(1,), dtype=np.float32)
+
+    def __init__(self, offset):
+        self.offset = offset
+        self.t = 0
+
+    def reset(self):
+        self.t = 0
+        return np.array([self.offset, self.t])
+
+    def step(self, action):
+        self.t += 1
+        return np.array([self.offset, self.t]), action[0], self.t >= 3, {}
+
+
+class TestVecEnv(unittest.TestCase):
+    """Tests the vectorized environments in flow/utils/vec_env.py."""
+
+    def test_shmem_vec_env(self):
+        env = ShmemVecEnv([lambda i=i: CountingEnv(i) for i in range(2)])
+        self.assertEqual(env.num_envs, 2)
+
+        # check that the observations of each worker are returned in order
+        obs = env.reset()
+        self.assertEqual(obs.dtype, np.float32)
+        np.testing.assert_array_equal(obs, [[0, 0], [1, 0]])
+
+        obs, rews, dones, _ = env.step(np.array([[0.5], [1]]))
+        np.testing.assert_array_equal(obs, [[0, 1], [1, 1]])
+        np.testing.assert_array_almost_equal(rews, [0.5, 1])
+        np.testing.assert_array_equal(dones, [False, False])
+
+        # check that the environments are reset once they are done, and that
+        # the terminal observations are returned in the infos
+        env.step(np.array([[0], [0]]))
+        obs, _, dones, infos = env.step(np.array([[0], [0]]))
+        np.testing.assert_array_equal(obs, [[0, 0], [1, 0]])
+        np.testing.assert_array_equal(dones, [True, True])
+        np.testing.assert_array_equal(
+            infos[1]['terminal_observation'], [1, 3])
+
+        # check the attribute getters and setters
+        self.assertListEqual(env.get_attr('offset'), [0, 1])
+        env.set_attr('offset', 5, indices=0)
+        self.assertListEqual(env.get_attr('offset'), [5, 1])
+
+        env.close()
+
+    def test_grouped_subproc_vec_env(self):
+        # five environments partitioned over three subprocesses
+        env = GroupedSubprocVecEnv(
+            [lambda i=i: CountingEnv(i) for i in range(5)], envs_per_proc=2)
+        self.assertEqual(env.num_envs, 5)
+        self.assertEqual(len(env.processes), 3)
+
+        obs = env.reset()
+        np.testing.assert_array_equal(obs[:, 0], [0, 1, 2, 3, 4])
+
+        obs, rews, dones, infos = env.step(np.arange(5).reshape((5, 1)))
+        np.testing.assert_array_equal(obs, [[i, 1] for i in range(5)])
+        np.testing.assert_array_almost_equal(rews, [0, 1, 2, 3, 4])
+        self.assertEqual(len(infos), 5)
+
+        # check that the attributes are mapped to the correct environments
+        self.assertListEqual(env.get_attr('offset', indices=[4, 1, 2]),
+                             [4, 1, 2])
+        env.set_attr('offset', 7, indices=3)
+        self.assertListEqual(env.get_attr('offset'), [0, 1, 2, 7, 4])
+        np.testing.assert_array_equal(
+            env.env_method('reset', indices=[0, 3])[1], [7, 0])
+
+        env.close()
+
 
 if __name__ == '__main__':
     unittest.main()
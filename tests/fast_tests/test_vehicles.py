@@ -196,6 +196,41 @@ class TestVehiclesClass(unittest.TestCase):
                          len(env.k.vehicle.get_rl_ids()))
 
 
+class TestVehicleStateArrays(unittest.TestCase):
+    """Tests the arrays storing the numeric states of the vehicles."""
+
+    def test_get_list(self):
+        """Check that the states of several vehicles match their own."""
+        vehicles = VehicleParams()
+        vehicles.add("test", num_vehicles=10)
+
+        env, _ = ring_road_exp_setup(vehicles=vehicles)
+        env.reset()
+        for _ in range(5):
+            env.step(rl_actions=[])
+
+        veh_ids = env.k.vehicle.get_ids() + ["not_a_vehicle"]
+        for getter in (env.k.vehicle.get_speed,
+                       env.k.vehicle.get_default_speed,
+                       env.k.vehicle.get_position,
+                       env.k.vehicle.get_lane):
+            self.assertListEqual(getter(veh_ids),
+                                 [getter(veh_id) for veh_id in veh_ids])
+        self.assertEqual(env.k.vehicle.get_speed("not_a_vehicle"), -1001)
+
+        # the speeds set in tests are read back
+        env.k.vehicle.test_set_speed("test_0", 12.5)
+        self.assertEqual(env.k.vehicle.get_speed(["test_0"]), [12.5])
+
+        # removed vehicles no longer have a state
+        env.k.vehicle.remove("test_1")
+        self.assertIsNone(env.k.vehicle.get_speed("test_1", error=None))
+        self.assertEqual(env.k.vehicle.get_speed(["test_1"], error=None),
+                         [None])
+
+        env.terminate()
+
+
 class TestMultiLaneData(unittest.TestCase):
     """
     Tests the functions get_lane_leaders(), get_lane_followers(),